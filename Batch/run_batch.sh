@@ -12,8 +12,35 @@ S3_BUCKET_NAME="${8:-${S3_BUCKET_NAME:-ecs-benchmarks-output}}"
 TESTCOMP_S3_BUCKET_NAME="${9:-${TESTCOMP_S3_BUCKET_NAME:-testcomp-benchmarks}}"
 REPORT_JOB_DEFINITION="${10:-${REPORT_JOB_DEFINITION:-generate-report}}"
 BRANCH_HIGHLIGHTING="${11:-${BRANCH_HIGHLIGHTING:-0}}"
+NO_TESTCOV="${12:-${NO_TESTCOV:-1}}"
+TESTCOV_CORES="${13:-${TESTCOV_CORES:-1}}"
+TESTCOV_MEMORY_GB="${14:-${TESTCOV_MEMORY_GB:-2}}"
 TIMESTAMP=$(date -u +"%Y_%m_%d_%H_%M")
 
+# Sikraken keeps one vCPU to itself, the pipelined TestCov stage needs one more per concurrent TestCov run.
+# The compute environment only has xlarge (4 vCPU) instances, a larger request would leave the job RUNNABLE forever.
+if ! [[ "$TESTCOV_CORES" =~ ^[0-9]+$ ]] || [ "$TESTCOV_CORES" -le 0 ] || [ "$TESTCOV_CORES" -gt 3 ]; then
+  echo "TESTCOV_CORES must be an integer between 1 and 3, got '$TESTCOV_CORES'" >&2
+  exit 1
+fi
+if ! [[ "$TESTCOV_MEMORY_GB" =~ ^[0-9]+$ ]] || [ "$TESTCOV_MEMORY_GB" -le 0 ]; then
+  echo "TESTCOV_MEMORY_GB must be a positive integer, got '$TESTCOV_MEMORY_GB'" >&2
+  exit 1
+fi
+
+# STACK_SIZE_GB is Sikraken's own stack limit, so each concurrent TestCov run gets TESTCOV_MEMORY_GB on top of it
+VCPUS=1
+MEMORY_MB=$((STACK_SIZE_GB * 1024))
+if [ "$NO_TESTCOV" -eq 0 ]; then
+  VCPUS=$((1 + TESTCOV_CORES))
+  MEMORY_MB=$((MEMORY_MB + TESTCOV_CORES * TESTCOV_MEMORY_GB * 1024))
+fi
+# xlarge instances have 32 GiB, part of which is reserved for the ECS agent and the OS
+if [ "$MEMORY_MB" -gt 30720 ]; then
+  echo "Job memory ${MEMORY_MB} MiB does not fit on the compute environment's xlarge instances (max 30720 MiB)" >&2
+  exit 1
+fi
+
 JOB_ID=$(aws batch submit-job \
   --job-name "sikraken-${CATEGORY}-${TIMESTAMP}" \
   --job-queue "$JOB_QUEUE" \
@@ -21,7 +48,8 @@ JOB_ID=$(aws batch submit-job \
   --array-properties size="$JOB_COUNT" \
   --retry-strategy '{"attempts": 5}' \
   --container-overrides "resourceRequirements=[
-    {type=MEMORY,value=$(($STACK_SIZE_GB * 1024))}
+    {type=VCPU,value=$VCPUS},
+    {type=MEMORY,value=$MEMORY_MB}
   ],environment=[
     {name=CATEGORY,value=$CATEGORY},
     {name=BUDGET,value=$BUDGET},
@@ -31,7 +59,9 @@ JOB_ID=$(aws batch submit-job \
     {name=JOB_COUNT,value=$JOB_COUNT},
     {name=S3_BUCKET_NAME,value=$S3_BUCKET_NAME},
     {name=TESTCOMP_S3_BUCKET_NAME,value=$TESTCOMP_S3_BUCKET_NAME},
-    {name=BRANCH_HIGHLIGHTING,value=$BRANCH_HIGHLIGHTING}
+    {name=BRANCH_HIGHLIGHTING,value=$BRANCH_HIGHLIGHTING},
+    {name=NO_TESTCOV,value=$NO_TESTCOV},
+    {name=TESTCOV_CORES,value=$TESTCOV_CORES}
   ]" \
   --query 'jobId' \
   --output text
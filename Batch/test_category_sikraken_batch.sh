@@ -11,7 +11,8 @@
 # The <category>.set file are in sv-benchmarks/c directory or can be user-defined
 # Outputs logs files into directory within a shared volume with a docker container /shared/output
 # Takes into account possible exclude set for ECA
-# For each benchmark: generate tests, upload log to S3 Bucket
+# For each benchmark: generate tests, queue the Sikraken output for TestCov, upload log to S3 Bucket
+# TestCov runs as a separate pipeline stage alongside later Sikraken calls, limited to TESTCOV_CORES concurrent runs
 
 # Example: ./SikrakenDevSpace/bin/test_category_sikraken.sh /home/chris/sv-benchmarks/c ECA 8 30 debug --ss=5
 
@@ -30,6 +31,8 @@ CATEGORY="${CATEGORY:-chris}"
 MODE="${MODE:-release}"
 BUDGET="${BUDGET:-10}"
 BRANCH_HIGHLIGHTING="${BRANCH_HIGHLIGHTING:-0}"
+NO_TESTCOV="${NO_TESTCOV:-1}"
+TESTCOV_CORES="${TESTCOV_CORES:-1}"
 TIMESTAMP="${TIMESTAMP:?TIMESTAMP environment variable not set}"
 
 #Using Batch environment variables 
@@ -58,7 +61,8 @@ mode=$MODE
 # --- Initialize Optional Variables ---
 shortcutgen=""
 shortcutgen_flag=0
-no_testcov=1 #Setting To 1 as no testcov usage yet in Batch version
+no_testcov=$NO_TESTCOV
+testcov_cores=$TESTCOV_CORES
 branch_highlight=$BRANCH_HIGHLIGHTING
 stack_size_gb=$STACK_SIZE_GB
 
@@ -93,6 +97,17 @@ echo "shortcutgen        = $shortcutgen"
 echo "job_index         = $JOB_INDEX"
 echo "job_count         = $JOB_COUNT"
 echo "stack_size         = $stack_size_gb"
+echo "no_testcov         = $no_testcov"
+echo "testcov_cores      = $testcov_cores"
+
+check_testcov_cores(){
+    # TestCov stage concurrency must be a positive integer
+    if ! [[ "$testcov_cores" =~ ^[0-9]+$ ]] || [ "$testcov_cores" -le 0 ]; then
+        echo "Sikraken ERROR from $script_name: TESTCOV_CORES must be a positive integer, got '$testcov_cores'."
+        exit 1
+    fi
+}
+check_testcov_cores
 
 check_benchmarks_path(){
     # Check if the path_to_benchmarks exists
@@ -174,8 +189,10 @@ generate_tests() {
     local benchmark_relative_path=$(realpath --relative-to="$SIKRAKEN_INSTALL_DIR" "$benchmark")
     local sikraken_call="$SIKRAKEN_INSTALL_DIR/bin/sikraken.sh $mode $gcc_flag budget[$budget] --ss=$stack_size_gb $benchmark_relative_path"
     echo -e "${BL}Calling Sikraken using: $sikraken_call${NC}"
+    local sikraken_start_ts=$(date +%s)
     $sikraken_call >> "$sikraken_log" 2>&1
     ret_code=$?
+    echo "$basename sikraken $(( $(date +%s) - sikraken_start_ts ))" >> "$stage_timings_file"
     if [ $ret_code -ne 0 ]; then
         error="Sikraken ERROR from $script_name: error code $ret_code for $basename, Call to Sikraken $sikraken_call failed"
         echo "$error" >> "$sikraken_log"
@@ -194,18 +211,92 @@ generate_tests() {
         echo -e "${YL}Skipping coverage branches highlighting${NC}"
     fi
 
-    if (( no_testcov == 1 )); then     #No TestCov support for Batch, removed debug message for it but keeping this line 
+    if (( no_testcov == 1 )); then
         echo -e "${YL}Skipping TestCov: relying on Sikraken coverage${NC}"
     else
-        testcov_call="$SIKRAKEN_INSTALL_DIR/bin/run_testcov.sh"   # program
-        testcov_args=( "$benchmark" "$testcov_data_model" )      # args as array
-        echo -e "${BL}Calling Testcov using: $testcov_call ${testcov_args[*]}${NC}"
+        # hand the completed Sikraken output over to the TestCov stage so the next benchmark can start straight away
+        # the queue is only opened for this write so Sikraken and the helper scripts never inherit it
+        echo "$benchmark $testcov_data_model" > "$testcov_queue"
+        echo -e "${BL}Queued $basename for TestCov${NC}"
+    fi
+}
+
+# function: run_testcov validates one completed Sikraken output, called by the TestCov stage worker
+run_testcov() {
+    local benchmark="$1"
+    local testcov_data_model="$2"
+
+    local basename=$(basename "$benchmark")
+    basename="${basename%.*}"
+    local benchmark_output_dir="$output_dir"/"$basename"
+
+    testcov_call="$SIKRAKEN_INSTALL_DIR/bin/run_testcov.sh"   # program
+    testcov_args=( "$benchmark" "$testcov_data_model" )      # args as array
+    echo -e "${BL}Calling Testcov using: $testcov_call ${testcov_args[*]}${NC}"
+
+    # run it without eval, preserving arguments and quoting
+    local testcov_start_ts=$(date +%s)
+    "$testcov_call" "${testcov_args[@]}" >"$benchmark_output_dir/testcov_call.log" 2>&1
+    echo "$basename testcov $(( $(date +%s) - testcov_start_ts ))" >> "$stage_timings_file"
+
+    echo -e "${GR}Ended TestCov for $basename${NC}"
+}
+
+# Job pool to limit the number of TestCov runs, separate from the single threaded Sikraken calls
+testcov_job_pool() {
+    while [ "$(jobs -r | wc -l)" -ge "$testcov_cores" ]; do
+        sleep 1  # Wait for an available slot
+    done
+}
 
-        # run it without eval, preserving arguments and quoting
-        "$testcov_call" "${testcov_args[@]}" >"$benchmark_output_dir/testcov_call.log" 2>&1
+# Reads "<benchmark> <testcov_data_model>" lines from the queue until the end marker, then waits for the last TestCov runs
+# The queue is opened read-write so it does not reach EOF between the writes from generate_tests
+testcov_stage_worker() {
+    exec {queue_fd}<>"$testcov_queue"
+    while read -r benchmark testcov_data_model <&"$queue_fd"; do
+        if [ "$benchmark" == "$testcov_queue_end" ]; then
+            break
+        fi
+        testcov_job_pool
+        run_testcov "$benchmark" "$testcov_data_model" {queue_fd}<&- &  # TestCov does not need the queue
+    done
+    wait
+}
 
-        echo -e "${GR}Ended TestCov for $basename${NC}"
+# The queue is a FIFO kept outside $output_dir so that it is never synced to S3
+start_testcov_stage() {
+    if (( no_testcov == 1 )); then
+        return
     fi
+    testcov_queue=$(mktemp -u /tmp/testcov_queue.XXXXXX)
+    testcov_queue_end="END_OF_TESTCOV_QUEUE"
+    mkfifo "$testcov_queue"
+    testcov_stage_worker &
+    testcov_stage_pid=$!
+}
+
+# The end marker lets the worker drain the queue and exit
+finish_testcov_stage() {
+    if (( no_testcov == 1 )); then
+        return
+    fi
+    echo "$testcov_queue_end" > "$testcov_queue"
+    wait "$testcov_stage_pid"
+    rm -f "$testcov_queue"
+}
+
+# Per-stage timings: Sikraken stage wall time, and when TestCov is enabled, TestCov time spent after the last Sikraken call and total TestCov time
+log_stage_timings() {
+    local sikraken_stage_seconds=$((sikraken_stage_end_ts - stage_start_ts))
+    echo "Sikraken Stage Duration: $(date -u -d @"$sikraken_stage_seconds" +"%H:%M:%S")" >> $log_file
+    if (( no_testcov == 1 )); then
+        return
+    fi
+    local testcov_drain_seconds=$((end_ts - sikraken_stage_end_ts))
+    local testcov_total_seconds=$(awk '$2 == "testcov" { total += $3 } END { print total + 0 }' "$stage_timings_file")
+    echo "TestCov Drain Duration: $(date -u -d @"$testcov_drain_seconds" +"%H:%M:%S")" >> $log_file
+    echo "TestCov Total Time: $(date -u -d @"$testcov_total_seconds" +"%H:%M:%S")" >> $log_file
+    echo "TestCov Cores: $testcov_cores" >> $log_file
 }
 
 ### MAIN starts here
@@ -213,6 +304,9 @@ start_wall_time=$(date +"%Y-%m-%d %H:%M:%S")    # Capture human-readable time an
 start_ts=$(date +%s)
 mkdir -p "$output_dir/benchmark_files"
 category_extracted_benchmarks_files="$output_dir"/benchmark_files/benchmark_files-$JOB_INDEX.txt  #output list of benchmarks for the category
+mkdir -p "$output_dir/stage_timings"
+stage_timings_file="$output_dir"/stage_timings/stage_timings-$JOB_INDEX.txt  #output "<benchmark> <stage> <seconds>" per benchmark and stage
+touch "$stage_timings_file"
 log_file="$output_dir"/category_test_run.log
 
 #printf -v orig_cmd '%q ' "${ORIG_ARGV[@]}"
@@ -284,6 +378,9 @@ download_assigned_benchmarks() {
 download_assigned_benchmarks
 
 run_benchmark(){
+    stage_start_ts=$(date +%s)    # stage timings start here, after the benchmarks have been downloaded
+    start_testcov_stage
+
     for rel_path in "${ASSIGNED_PATTERNS[@]}"; do
 
         pattern_benchmark_directory=$rel_path
@@ -327,6 +424,9 @@ run_benchmark(){
         done #no more *.yml file
     done
 
+    sikraken_stage_end_ts=$(date +%s)
+    finish_testcov_stage    # wait for the queued TestCov runs to complete
+
     # Capture human-readable time and Unix timestamp for end
     end_wall_time=$(date +"%Y-%m-%d %H:%M:%S")
     end_ts=$(date +%s)
@@ -336,6 +436,7 @@ run_benchmark(){
     duration_hms=$(date -u -d @"$duration_seconds" +"%H:%M:%S")
     echo "Sikraken $script_name: Duration: $duration_hms"
     echo "Duration: $duration_hms" >> $log_file
+    log_stage_timings
 }
 
 run_benchmark
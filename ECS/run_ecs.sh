@@ -7,8 +7,52 @@ TASK_COUNT="${3:-${TASK_COUNT:-5}}"
 CATEGORY="${4:-${CATEGORY:-chris}}"
 BUDGET="${5:-${BUDGET:-10}}"
 MODE="${6:-${MODE:-release}}"
+NO_TESTCOV="${7:-${NO_TESTCOV:-1}}"
+TESTCOV_CORES="${8:-${TESTCOV_CORES:-1}}"
+TASK_MEMORY="${9:-${TASK_MEMORY:-3072}}"
+TESTCOV_MEMORY_GB="${10:-${TESTCOV_MEMORY_GB:-2}}"
 TIMESTAMP=$(date -u +"%Y_%m_%d_%H_%M")
 
+# Fargate tops out at 16 vCPUs, one of which is kept for Sikraken
+if ! [[ "$TESTCOV_CORES" =~ ^[0-9]+$ ]] || [ "$TESTCOV_CORES" -le 0 ] || [ "$TESTCOV_CORES" -gt 15 ]; then
+  echo "TESTCOV_CORES must be an integer between 1 and 15, got '$TESTCOV_CORES'" >&2
+  exit 1
+fi
+if ! [[ "$TASK_MEMORY" =~ ^[0-9]+$ ]] || [ "$TASK_MEMORY" -le 0 ]; then
+  echo "TASK_MEMORY must be a positive integer (MiB), got '$TASK_MEMORY'" >&2
+  exit 1
+fi
+if ! [[ "$TESTCOV_MEMORY_GB" =~ ^[0-9]+$ ]] || [ "$TESTCOV_MEMORY_GB" -le 0 ]; then
+  echo "TESTCOV_MEMORY_GB must be a positive integer, got '$TESTCOV_MEMORY_GB'" >&2
+  exit 1
+fi
+
+# Sikraken keeps one vCPU to itself, the pipelined TestCov stage needs one more per concurrent TestCov run.
+# Fargate only accepts 1, 2, 4, 8 or 16 vCPUs, each with its own memory range and step, so round up to match.
+# An invalid size would make launch_task retry forever.
+TASK_RESOURCE_OVERRIDES=""
+if [ "$NO_TESTCOV" -eq 0 ]; then
+  VCPUS=1
+  while (( VCPUS < 1 + TESTCOV_CORES )); do
+    VCPUS=$((VCPUS * 2))
+  done
+  case "$VCPUS" in
+    2)  MEMORY_STEP=1024; MEMORY_MAX=16384 ;;
+    4)  MEMORY_STEP=1024; MEMORY_MAX=30720 ;;
+    8)  MEMORY_STEP=4096; MEMORY_MAX=61440 ;;
+    16) MEMORY_STEP=8192; MEMORY_MAX=122880 ;;
+  esac
+  TASK_CPU=$((VCPUS * 1024))
+  TASK_MEMORY=$((TASK_MEMORY + TESTCOV_CORES * TESTCOV_MEMORY_GB * 1024))   # TASK_MEMORY is sized for Sikraken alone
+  TASK_MEMORY=$(( TASK_MEMORY > VCPUS * 2048 ? TASK_MEMORY : VCPUS * 2048 ))   # at least 2 GB per vCPU
+  TASK_MEMORY=$(( (TASK_MEMORY + MEMORY_STEP - 1) / MEMORY_STEP * MEMORY_STEP ))
+  if (( TASK_MEMORY > MEMORY_MAX )); then
+    echo "Task memory ${TASK_MEMORY} MiB exceeds the Fargate maximum of ${MEMORY_MAX} MiB for $VCPUS vCPUs" >&2
+    exit 1
+  fi
+  TASK_RESOURCE_OVERRIDES="\"cpu\": \"$TASK_CPU\", \"memory\": \"$TASK_MEMORY\","
+fi
+
 SUBNET_ARRAY=(subnet-00575f764f10645c4 subnet-0d48c3c69206076d1 subnet-0a693be6424dd272a)
 SG="sg-0b94b75a72c6f0356"
 
@@ -24,6 +68,7 @@ launch_task() {
         --launch-type FARGATE \
         --count 1 \
         --overrides "{
+          $TASK_RESOURCE_OVERRIDES
           \"containerOverrides\": [
             {
               \"name\": \"sikraken-container\",
@@ -33,7 +78,9 @@ launch_task() {
                 {\"name\": \"MODE\", \"value\": \"$MODE\"},
                 {\"name\": \"TASK_INDEX\", \"value\": \"$TASK_INDEX\"},
                 {\"name\": \"TASK_COUNT\", \"value\": \"$TASK_COUNT\"},
-                {\"name\": \"TIMESTAMP\", \"value\": \"$TIMESTAMP\"}
+                {\"name\": \"TIMESTAMP\", \"value\": \"$TIMESTAMP\"},
+                {\"name\": \"NO_TESTCOV\", \"value\": \"$NO_TESTCOV\"},
+                {\"name\": \"TESTCOV_CORES\", \"value\": \"$TESTCOV_CORES\"}
               ]
             }
           ]
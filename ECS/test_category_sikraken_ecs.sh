@@ -11,7 +11,8 @@
 # The <category>.set file are in sv-benchmarks/c directory or can be user-defined
 # Outputs logs files into directory within a shared volume with a docker container /shared/output
 # Takes into account possible exclude set for ECA
-# For each benchmark: generate tests, upload log to S3 Bucket
+# For each benchmark: generate tests, queue the Sikraken output for TestCov, upload log to S3 Bucket
+# TestCov runs as a separate pipeline stage alongside later Sikraken calls, limited to TESTCOV_CORES concurrent runs
 
 # Example: ./SikrakenDevSpace/bin/test_category_sikraken.sh /home/chris/sv-benchmarks/c ECA 8 30 debug --ss=5
 
@@ -31,6 +32,8 @@ STACK_SIZE_GB="${STACK_SIZE_GB:-3}"
 CATEGORY="${CATEGORY:-chris}"
 MODE="${MODE:-release}"
 BUDGET="${BUDGET:-10}"
+NO_TESTCOV="${NO_TESTCOV:-1}"
+TESTCOV_CORES="${TESTCOV_CORES:-1}"
 TIMESTAMP="${TIMESTAMP:?TIMESTAMP environment variable not set}"
 
 TASK_COUNT="${TASK_COUNT:-1}"   
@@ -70,7 +73,8 @@ mode=$MODE
 # --- Initialize Optional Variables ---
 shortcutgen=""
 shortcutgen_flag=0
-no_testcov=1 #Setting To 1 as no testcov usage yet in ECS version
+no_testcov=$NO_TESTCOV
+testcov_cores=$TESTCOV_CORES
 branch_highlight=0
 stack_size_gb=3
 
@@ -114,6 +118,16 @@ echo "budget             = $budget"
 echo "mode               = $mode"
 echo "shortcutgen        = $shortcutgen"
 echo "no_testcov         = $no_testcov"
+echo "testcov_cores      = $testcov_cores"
+
+check_testcov_cores(){
+    # TestCov stage concurrency must be a positive integer
+    if ! [[ "$testcov_cores" =~ ^[0-9]+$ ]] || [ "$testcov_cores" -le 0 ]; then
+        echo "Sikraken ERROR from $script_name: TESTCOV_CORES must be a positive integer, got '$testcov_cores'."
+        exit 1
+    fi
+}
+check_testcov_cores
 
 check_benchmarks_path(){
     # Check if the path_to_benchmarks exists
@@ -122,7 +136,7 @@ check_benchmarks_path(){
         exit 1
     fi
 }
-check_benchmarks_path()
+check_benchmarks_path
 
 retrieve_category_file(){
     category_file="$category".set   #input file describing the category
@@ -156,7 +170,7 @@ retrieve_category_file(){
 
     echo "Sikraken $script_name log: called: $script_name $@"
 }
-retrieve_category_file()
+retrieve_category_file
 
 compile_parser(){
     # re-compile the parser in case it changed during development
@@ -168,14 +182,14 @@ compile_parser(){
         echo "Sikraken $script_name log: Sikraken parser successfully recompiled"
     fi
 }
-compile_parser()
+compile_parser
 
 set_output_directory(){
     output_dir="$OUTPUT_SHARED/$TIMESTAMP"
     echo "The output dir is $output_dir"
     mkdir -p "$output_dir"
 }
-set_output_directory()
+set_output_directory
 # function: generate_tests runs single threaded for ECS
 # and terminated with 'return 1' instead of 'exit 1'.
 generate_tests() {
@@ -194,8 +208,10 @@ generate_tests() {
     local benchmark_relative_path=$(realpath --relative-to="$SIKRAKEN_INSTALL_DIR" "$benchmark")
     local sikraken_call="$SIKRAKEN_INSTALL_DIR/bin/sikraken.sh $mode $gcc_flag budget[$budget] --ss=$stack_size_gb $benchmark_relative_path"
     echo -e "${BL}Calling Sikraken using: $sikraken_call${NC}"
+    local sikraken_start_ts=$(date +%s)
     $sikraken_call >> "$sikraken_log" 2>&1
     ret_code=$?
+    echo "$basename sikraken $(( $(date +%s) - sikraken_start_ts ))" >> "$stage_timings_file"
     if [ $ret_code -ne 0 ]; then
         error="Sikraken ERROR from $script_name: error code $ret_code for $basename, Call to Sikraken $sikraken_call failed"
         echo "$error" >> "$sikraken_log"
@@ -217,15 +233,89 @@ generate_tests() {
     if (( no_testcov == 1 )); then
         echo -e "${YL}Skipping TestCov: relying on Sikraken coverage${NC}"
     else
-        testcov_call="$SIKRAKEN_INSTALL_DIR/bin/run_testcov.sh"   # program
-        testcov_args=( "$benchmark" "$testcov_data_model" )      # args as array
-        echo -e "${BL}Calling Testcov using: $testcov_call ${testcov_args[*]}${NC}"
+        # hand the completed Sikraken output over to the TestCov stage so the next benchmark can start straight away
+        # the queue is only opened for this write so Sikraken and the helper scripts never inherit it
+        echo "$benchmark $testcov_data_model" > "$testcov_queue"
+        echo -e "${BL}Queued $basename for TestCov${NC}"
+    fi
+}
 
-        # run it without eval, preserving arguments and quoting
-        "$testcov_call" "${testcov_args[@]}" >"$benchmark_output_dir/testcov_call.log" 2>&1
+# function: run_testcov validates one completed Sikraken output, called by the TestCov stage worker
+run_testcov() {
+    local benchmark="$1"
+    local testcov_data_model="$2"
 
-        echo -e "${GR}Ended TestCov for $basename${NC}"
+    local basename=$(basename "$benchmark")
+    basename="${basename%.*}"
+    local benchmark_output_dir="$output_dir"/"$basename"
+
+    testcov_call="$SIKRAKEN_INSTALL_DIR/bin/run_testcov.sh"   # program
+    testcov_args=( "$benchmark" "$testcov_data_model" )      # args as array
+    echo -e "${BL}Calling Testcov using: $testcov_call ${testcov_args[*]}${NC}"
+
+    # run it without eval, preserving arguments and quoting
+    local testcov_start_ts=$(date +%s)
+    "$testcov_call" "${testcov_args[@]}" >"$benchmark_output_dir/testcov_call.log" 2>&1
+    echo "$basename testcov $(( $(date +%s) - testcov_start_ts ))" >> "$stage_timings_file"
+
+    echo -e "${GR}Ended TestCov for $basename${NC}"
+}
+
+# Job pool to limit the number of TestCov runs, separate from the single threaded Sikraken calls
+testcov_job_pool() {
+    while [ "$(jobs -r | wc -l)" -ge "$testcov_cores" ]; do
+        sleep 1  # Wait for an available slot
+    done
+}
+
+# Reads "<benchmark> <testcov_data_model>" lines from the queue until the end marker, then waits for the last TestCov runs
+# The queue is opened read-write so it does not reach EOF between the writes from generate_tests
+testcov_stage_worker() {
+    exec {queue_fd}<>"$testcov_queue"
+    while read -r benchmark testcov_data_model <&"$queue_fd"; do
+        if [ "$benchmark" == "$testcov_queue_end" ]; then
+            break
+        fi
+        testcov_job_pool
+        run_testcov "$benchmark" "$testcov_data_model" {queue_fd}<&- &  # TestCov does not need the queue
+    done
+    wait
+}
+
+# The queue is a FIFO kept outside $output_dir so that it is never synced to S3
+start_testcov_stage() {
+    if (( no_testcov == 1 )); then
+        return
+    fi
+    testcov_queue=$(mktemp -u /tmp/testcov_queue.XXXXXX)
+    testcov_queue_end="END_OF_TESTCOV_QUEUE"
+    mkfifo "$testcov_queue"
+    testcov_stage_worker &
+    testcov_stage_pid=$!
+}
+
+# The end marker lets the worker drain the queue and exit
+finish_testcov_stage() {
+    if (( no_testcov == 1 )); then
+        return
+    fi
+    echo "$testcov_queue_end" > "$testcov_queue"
+    wait "$testcov_stage_pid"
+    rm -f "$testcov_queue"
+}
+
+# Per-stage timings: Sikraken stage wall time, and when TestCov is enabled, TestCov time spent after the last Sikraken call and total TestCov time
+log_stage_timings() {
+    local sikraken_stage_seconds=$((sikraken_stage_end_ts - stage_start_ts))
+    echo "Sikraken Stage Duration: $(date -u -d @"$sikraken_stage_seconds" +"%H:%M:%S")" >> $log_file
+    if (( no_testcov == 1 )); then
+        return
     fi
+    local testcov_drain_seconds=$((end_ts - sikraken_stage_end_ts))
+    local testcov_total_seconds=$(awk '$2 == "testcov" { total += $3 } END { print total + 0 }' "$stage_timings_file")
+    echo "TestCov Drain Duration: $(date -u -d @"$testcov_drain_seconds" +"%H:%M:%S")" >> $log_file
+    echo "TestCov Total Time: $(date -u -d @"$testcov_total_seconds" +"%H:%M:%S")" >> $log_file
+    echo "TestCov Cores: $testcov_cores" >> $log_file
 }
 
 ### MAIN starts here
@@ -233,6 +323,9 @@ start_wall_time=$(date +"%Y-%m-%d %H:%M:%S")    # Capture human-readable time an
 start_ts=$(date +%s)
 
 category_extracted_benchmarks_files="$output_dir"/benchmark_files.txt  #output list of benchmarks for the category
+mkdir -p "$output_dir/stage_timings"
+stage_timings_file="$output_dir"/stage_timings/stage_timings-$TASK_INDEX.txt  #output "<benchmark> <stage> <seconds>" per benchmark and stage
+touch "$stage_timings_file"
 log_file="$output_dir"/category_test_run.log
 
 #printf -v orig_cmd '%q ' "${ORIG_ARGV[@]}"
@@ -254,6 +347,9 @@ run_benchmark(){
         exit 1
     fi
 
+    stage_start_ts=$(date +%s)    # stage timings start here, not at script start
+    start_testcov_stage
+
     for i in "${!PATTERNS[@]}"; do
         if (( i % TASK_COUNT != TASK_INDEX )); then
             continue
@@ -300,6 +396,9 @@ run_benchmark(){
         done #no more *.yml file
     done
 
+    sikraken_stage_end_ts=$(date +%s)
+    finish_testcov_stage    # wait for the queued TestCov runs to complete
+
     # Capture human-readable time and Unix timestamp for end
     end_wall_time=$(date +"%Y-%m-%d %H:%M:%S")
     end_ts=$(date +%s)
@@ -309,9 +408,10 @@ run_benchmark(){
     duration_hms=$(date -u -d @"$duration_seconds" +"%H:%M:%S")
     echo "Sikraken $script_name: Duration: $duration_hms"
     echo "Duration: $duration_hms" >> $log_file
+    log_stage_timings
 }
 
-run_benchmark()
+run_benchmark
 #generate_table_script="$SIKRAKEN_INSTALL_DIR/SikrakenDevSpace/bin/helper/create_category_test_run_table.sh $output_dir"
 #echo "Sikraken $script_name: now calling $generate_table_script"
 #$generate_table_script
@@ -335,4 +435,4 @@ upload_to_s3(){
 
     echo "Sikraken $script_name log: has ended."
 }
-upload_to_s3()
\ No newline at end of file
+upload_to_s3